@@ -16,6 +16,8 @@ logging.basicConfig(level=logging.DEBUG)
 
 # Import db and models
 from models import db, User, Room, Amenity, BookingInquiry, ContactInquiry
+from compression import init_compression
+from template_cache import init_template_cache
 
 mail = Mail()
 login_manager = LoginManager()
@@ -41,7 +43,26 @@ app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
 app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
 app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER', 'jabezmageto78@gmail.com')
 
+# Compression configuration
+app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', '500'))
+app.config['COMPRESS_LEVEL'] = int(os.environ.get('COMPRESS_LEVEL', '6'))
+app.config['COMPRESS_BR_LEVEL'] = int(os.environ.get('COMPRESS_BR_LEVEL', '4'))
+app.config['MINIFY_HTML'] = os.environ.get('MINIFY_HTML', 'false').lower() in ['true', 'on', '1']
+
+# Asynchronous inquiry ingestion (see ingestion.py)
+app.config['INGEST_ASYNC'] = os.environ.get('INGEST_ASYNC', 'false').lower() in ['true', 'on', '1']
+app.config['INGEST_QUEUE_SIZE'] = int(os.environ.get('INGEST_QUEUE_SIZE', '1000'))
+app.config['INGEST_BATCH_SIZE'] = int(os.environ.get('INGEST_BATCH_SIZE', '100'))
+app.config['INGEST_FLUSH_INTERVAL'] = float(os.environ.get('INGEST_FLUSH_INTERVAL', '0.05'))
+app.config['INGEST_ENQUEUE_TIMEOUT'] = float(os.environ.get('INGEST_ENQUEUE_TIMEOUT', '2'))
+app.config['INGEST_JOURNAL_PATH'] = os.environ.get('INGEST_JOURNAL_PATH', os.path.join(app.instance_path, 'ingest.journal'))
+
+# Template bytecode cache (set TEMPLATE_CACHE_DIR to an empty string to disable)
+app.config['TEMPLATE_CACHE_DIR'] = os.environ.get('TEMPLATE_CACHE_DIR', os.path.join(app.root_path, '.jinja_cache'))
+
 # Initialize extensions
+init_compression(app)
+init_template_cache(app)
 db.init_app(app)
 mail.init_app(app)
 login_manager.init_app(app)
@@ -0,0 +1,51 @@
+"""
+Static asset manifest for the service worker.
+
+Every file under static/ is hashed; the combined hash is the cache version,
+so any deploy that changes a static file installs a new service worker and
+purges the previous caches. Small assets are listed for pre-caching, large
+ones (the hero photos) are cached the first time a page uses them.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+# Files larger than this are cached on first use instead of at install time
+PRECACHE_MAX_SIZE = 256 * 1024
+
+_lock = threading.Lock()
+_script = None
+
+
+def build_manifest(static_folder, static_url_path):
+    """Hash the static directory and return the service worker manifest"""
+    version = hashlib.sha1()
+    precache = []
+
+    for directory, subdirs, files in os.walk(static_folder):
+        subdirs.sort()
+        for filename in sorted(files):
+            path = os.path.join(directory, filename)
+            relative = os.path.relpath(path, static_folder).replace(os.sep, '/')
+            with open(path, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            version.update(f"{relative}:{digest}\n".encode())
+            if os.path.getsize(path) <= PRECACHE_MAX_SIZE and relative != 'js/sw.js':
+                precache.append(f"{static_url_path}/{relative}")
+
+    return {'version': version.hexdigest()[:12], 'precache': precache}
+
+
+def service_worker_script(app, offline_url):
+    """static/js/sw.js with the manifest prepended; built once per process"""
+    global _script
+    with _lock:
+        if _script is None or app.debug:
+            manifest = build_manifest(app.static_folder, app.static_url_path)
+            manifest['offline'] = offline_url
+            with open(os.path.join(app.static_folder, 'js', 'sw.js'), encoding='utf-8') as f:
+                source = f.read()
+            _script = f"self.ASSET_MANIFEST = {json.dumps(manifest)};\n{source}"
+        return _script
@@ -0,0 +1,167 @@
+"""
+Room availability calendar.
+
+Each room/month is cached as a bitmap int where bit ``day - 1`` is set when
+that night is taken by a non-cancelled booking inquiry. Months are loaded
+from the database in one query per missing window and then kept up to date
+as inquiries are created or change status, so serving the calendar does not
+touch the inquiries table on cache hits. Only the WINDOW_MONTHS months from
+the current one are served; months that fall out of the window are evicted.
+"""
+
+import calendar
+import threading
+import time
+from datetime import date, timedelta
+
+from models import Room, BookingInquiry
+
+# Statuses that do not block a room
+FREE_STATUSES = ('cancelled',)
+
+# Months served by the calendar endpoint
+CALENDAR_MONTHS = 12
+
+# Months from the current one that the calendar may start in and cache
+WINDOW_MONTHS = 24
+
+# Reload a cached month after this many seconds in case another process changed it
+CACHE_TTL = 600
+
+_lock = threading.Lock()
+_bitmaps = {}  # (year, month) -> {room_id: bitmap}
+_loaded_at = {}  # (year, month) -> time.monotonic() of the last load
+
+
+def _add_months(year, month, count):
+    index = year * 12 + (month - 1) + count
+    return index // 12, index % 12 + 1
+
+
+def month_range(year, month, count):
+    """List of (year, month) pairs starting at year/month"""
+    return [_add_months(year, month, offset) for offset in range(count)]
+
+
+def clamp_start(year, month):
+    """Move a calendar start so all CALENDAR_MONTHS months fall inside the window"""
+    today = date.today()
+    first = today.year * 12 + today.month - 1
+    index = min(max(year * 12 + month - 1, first), first + WINDOW_MONTHS - CALENDAR_MONTHS)
+    return index // 12, index % 12 + 1
+
+
+def _evict_outside_window():
+    # Caller holds _lock
+    today = date.today()
+    window = set(month_range(today.year, today.month, WINDOW_MONTHS))
+    for key in [key for key in _bitmaps if key not in window]:
+        _bitmaps.pop(key, None)
+        _loaded_at.pop(key, None)
+
+
+def _set_bits(bitmaps, room_id, check_in, check_out, months=None):
+    """OR the nights of one stay into per-month bitmaps, optionally limited to `months`"""
+    day = check_in
+    while day < check_out:
+        key = (day.year, day.month)
+        days_in_month = calendar.monthrange(day.year, day.month)[1]
+        month_end = date(day.year, day.month, days_in_month) + timedelta(days=1)
+        last = min(check_out, month_end)
+        if months is None or key in months:
+            mask = ((1 << (last - day).days) - 1) << (day.day - 1)
+            room_bitmaps = bitmaps.setdefault(key, {})
+            room_bitmaps[room_id] = room_bitmaps.get(room_id, 0) | mask
+        day = last
+
+
+def _load(months):
+    """Build bitmaps for the given months from the database"""
+    first = date(*months[0], 1)
+    last_year, last_month = months[-1]
+    end = date(last_year, last_month, calendar.monthrange(last_year, last_month)[1]) + timedelta(days=1)
+
+    rows = BookingInquiry.query.with_entities(
+        BookingInquiry.room_id, BookingInquiry.check_in, BookingInquiry.check_out
+    ).filter(
+        BookingInquiry.status.notin_(FREE_STATUSES),
+        BookingInquiry.check_in < end,
+        BookingInquiry.check_out > first,
+    )
+
+    wanted = set(months)
+    bitmaps = {key: {} for key in months}
+    for room_id, check_in, check_out in rows:
+        _set_bits(bitmaps, room_id, max(check_in, first), min(check_out, end), wanted)
+    return bitmaps
+
+
+def get_bitmaps(year, month, count=CALENDAR_MONTHS):
+    """Return {(year, month): {room_id: bitmap}} for `count` months from year/month"""
+    months = month_range(year, month, count)
+    now = time.monotonic()
+    with _lock:
+        _evict_outside_window()
+        missing = [key for key in months if now - _loaded_at.get(key, -CACHE_TTL) >= CACHE_TTL]
+        if missing:
+            # One query covering the span of stale months
+            span = month_range(*missing[0], months.index(missing[-1]) - months.index(missing[0]) + 1)
+            for key, room_bitmaps in _load(span).items():
+                _bitmaps[key] = room_bitmaps
+                _loaded_at[key] = now
+        return {key: dict(_bitmaps[key]) for key in months}
+
+
+def update_availability(inquiry, old_status=None):
+    """Keep cached bitmaps in step with a committed inquiry.
+
+    Call after committing a new inquiry (old_status=None) or a status change.
+    Newly blocking stays are OR-ed in; stays that stop blocking a room evict
+    the affected months so they are rebuilt from the database on next access.
+    """
+    blocks = inquiry.status not in FREE_STATUSES
+    blocked = old_status is not None and old_status not in FREE_STATUSES
+    if blocks == blocked:
+        return
+
+    with _lock:
+        if blocks:
+            cached = {key for key in _bitmaps}
+            _set_bits(_bitmaps, inquiry.room_id, inquiry.check_in, inquiry.check_out, cached)
+        else:
+            affected = {}
+            _set_bits(affected, inquiry.room_id, inquiry.check_in, inquiry.check_out)
+            for key in affected:
+                _bitmaps.pop(key, None)
+                _loaded_at.pop(key, None)
+
+
+def invalidate_availability():
+    """Drop every cached month"""
+    with _lock:
+        _bitmaps.clear()
+        _loaded_at.clear()
+
+
+def calendar_payload(year, month, count=CALENDAR_MONTHS):
+    """JSON-ready availability for every bookable room, starting no earlier than this month"""
+    year, month = clamp_start(year, month)
+    bitmaps = get_bitmaps(year, month, count)
+    months = month_range(year, month, count)
+    rooms = Room.query.filter_by(is_available=True).order_by(Room.name).all()
+    return {
+        'start': f"{year:04d}-{month:02d}",
+        'months': [
+            {'month': f"{y:04d}-{m:02d}", 'days': calendar.monthrange(y, m)[1],
+             'first_weekday': calendar.monthrange(y, m)[0]}
+            for y, m in months
+        ],
+        'rooms': [
+            {
+                'room_id': room.id,
+                'name': room.name,
+                'booked': [bitmaps[key].get(room.id, 0) for key in months],
+            }
+            for room in rooms
+        ],
+    }
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+First-request latency per route for a freshly started process.
+
+Each route is measured in a new interpreter, as a recycled gunicorn worker
+would see it, once with an empty template bytecode cache and once with a
+cache filled by ``flask templates precompile``. Every GET route without URL
+arguments is taken from the app's URL map.
+
+Usage (against a database populated by init_db.py):
+    python benchmarks/bench_cold_start.py [runs]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Routes whose only effect is a redirect with side effects
+SKIP_PATHS = {'/admin/logout'}
+
+# Runs inside the child process: import the app, then time the first two requests
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from app import app
+from models import User
+client = app.test_client()
+path = sys.argv[1]
+if path.startswith('/admin/') and path != '/admin/login':
+    with app.app_context():
+        admin = User.query.filter_by(is_admin=True).first()
+    if admin is None:
+        print(json.dumps(None)); sys.exit()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(admin.id)
+        session['_fresh'] = True
+start = time.perf_counter()
+client.get(path)
+first = time.perf_counter() - start
+start = time.perf_counter()
+client.get(path)
+second = time.perf_counter() - start
+print(json.dumps([first * 1000, second * 1000]))
+"""
+
+
+def discover_paths():
+    """Every GET route without URL arguments, public ones first"""
+    sys.path.insert(0, ROOT)
+    from app import app
+
+    paths = sorted(
+        rule.rule for rule in app.url_map.iter_rules()
+        if 'GET' in rule.methods and not rule.arguments and rule.endpoint != 'static'
+        and rule.rule not in SKIP_PATHS
+    )
+    admin = [path for path in paths if path.startswith('/admin/') and path != '/admin/login']
+    return [path for path in paths if path not in admin] + admin
+
+
+def run_child(path, cache_dir):
+    env = dict(os.environ, TEMPLATE_CACHE_DIR=cache_dir)
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD.format(root=ROOT), path],
+        env=env, cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def precompile(cache_dir):
+    env = dict(os.environ, TEMPLATE_CACHE_DIR=cache_dir)
+    subprocess.run(
+        [sys.executable, '-m', 'flask', '--app', 'main', 'templates', 'precompile'],
+        env=env, cwd=ROOT, check=True, capture_output=True,
+    )
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    paths = discover_paths()
+
+    with tempfile.TemporaryDirectory() as warm_dir:
+        precompile(warm_dir)
+
+        print(f"runs={runs}  (median ms)")
+        print(f"{'path':<20}{'cold first':>12}{'warm first':>12}{'steady':>10}")
+        for path in paths:
+            cold, warm, steady = [], [], []
+            for _ in range(runs):
+                # A fresh, empty cache directory every run
+                with tempfile.TemporaryDirectory() as cold_dir:
+                    timings = run_child(path, cold_dir)
+                if timings is None:
+                    break
+                cold.append(timings[0])
+                first, second = run_child(path, warm_dir)
+                warm.append(first)
+                steady.append(second)
+            if not cold:
+                print(f"{path:<20}{'skipped (no admin user)':>34}")
+                continue
+            print(f"{path:<20}{median(cold):>12.1f}{median(warm):>12.1f}{median(steady):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Bytes on the wire and CPU cost per response, with and without compression.
+
+Usage (against a database populated by init_db.py):
+    python benchmarks/bench_compression.py [iterations]
+
+Run once with MINIFY_HTML=true and once without to compare minification.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from models import User
+import compression
+
+PUBLIC_PATHS = [
+    '/', '/rooms', '/amenities', '/gallery', '/booking', '/contact',
+    '/static/css/style.css', '/static/js/main.js',
+]
+ADMIN_PATHS = ['/admin/dashboard', '/admin/bookings', '/admin/rooms']
+
+
+def measure(client, path, accept_encoding, iterations):
+    """Return (body bytes, CPU ms per request, encoding used)"""
+    headers = {'Accept-Encoding': accept_encoding}
+    response = client.get(path, headers=headers)
+    start = time.process_time()
+    for _ in range(iterations):
+        response = client.get(path, headers=headers)
+    cpu_ms = (time.process_time() - start) * 1000 / iterations
+    return len(response.get_data()), cpu_ms, response.headers.get('Content-Encoding', 'identity')
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    encodings = ['identity', 'gzip'] + (['br'] if compression.brotli is not None else [])
+    client = app.test_client()
+    paths = list(PUBLIC_PATHS)
+
+    with app.app_context():
+        admin = User.query.filter_by(is_admin=True).first()
+    if admin:
+        with client.session_transaction() as session:
+            session['_user_id'] = str(admin.id)
+            session['_fresh'] = True
+        paths += ADMIN_PATHS
+
+    print(f"MINIFY_HTML={app.config['MINIFY_HTML']}  iterations={iterations}")
+    print(f"{'path':<24}" + ''.join(f"{enc + ' bytes':>14}{enc + ' ms':>11}" for enc in encodings))
+    for path in paths:
+        row = f"{path:<24}"
+        for encoding in encodings:
+            size, cpu_ms, used = measure(client, path, encoding, iterations)
+            marker = '' if used == encoding else '*'
+            row += f"{size:>13}{marker or ' '}{cpu_ms:>11.2f}"
+        print(row)
+    print("* response was not sent with the requested encoding (too small or not compressible)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Response compression and HTML whitespace minification.
+
+An after_request hook negotiates brotli (when the optional ``brotli`` package
+is installed) or gzip with the client and compresses text responses. Small
+bodies, streamed responses and bodies that already carry a Content-Encoding
+are sent as they are. Static files are compressed once per file version and
+served from a small in-memory cache.
+
+With MINIFY_HTML enabled, Jinja trims block whitespace and templates are
+minified at compile time, so the cost is paid once per template.
+"""
+
+import gzip
+import re
+import threading
+from collections import OrderedDict
+
+from flask import request
+from jinja2.ext import Extension
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript',
+    'application/javascript', 'application/json', 'application/xml', 'image/svg+xml',
+}
+
+# Static files larger than this are sent uncompressed rather than read into memory
+MAX_STATIC_SIZE = 2 * 1024 * 1024
+
+# Compressed static files kept in memory, keyed by (ETag, encoding)
+STATIC_CACHE_SIZE = 128
+
+_static_cache = OrderedDict()
+_static_lock = threading.Lock()
+
+# Blocks whose whitespace is significant
+_PROTECTED_RE = re.compile(r'(<(pre|textarea|script)\b.*?</\2\s*>)', re.IGNORECASE | re.DOTALL)
+_NEWLINE_RUN_RE = re.compile(r'[ \t\r\f\v]*\n\s*')
+
+
+def _encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def compress(data, encoding, level):
+    """Compress bytes with the given content-coding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _compress_static(etag, encoding, data):
+    """Compress a static file at maximum level, once per file version"""
+    # The ETag changes with the file, so stale entries simply age out
+    key = (etag, encoding)
+    with _static_lock:
+        body = _static_cache.get(key)
+        if body is not None:
+            _static_cache.move_to_end(key)
+            return body
+    body = compress(data, encoding, 11 if encoding == 'br' else 9)
+    with _static_lock:
+        _static_cache[key] = body
+        while len(_static_cache) > STATIC_CACHE_SIZE:
+            _static_cache.popitem(last=False)
+    return body
+
+
+def minify_html(source):
+    """Collapse indentation and blank lines outside <pre>, <textarea> and <script>"""
+    parts = _PROTECTED_RE.split(source)
+    out = []
+    # split() yields text, whole protected block, tag name, text, ...
+    for i in range(0, len(parts), 3):
+        out.append(_NEWLINE_RUN_RE.sub('\n', parts[i]))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return ''.join(out)
+
+
+class WhitespaceMinifier(Extension):
+    """Jinja extension that minifies HTML template source before compilation"""
+
+    def preprocess(self, source, name, filename=None):
+        if name and not name.endswith(('.html', '.htm')):
+            return source
+        return minify_html(source)
+
+
+def _should_compress(response):
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.is_streamed and not response.direct_passthrough:
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return False
+    return True
+
+
+def init_compression(app):
+    """Register the compression hook and, if enabled, HTML minification"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+    app.config.setdefault('MINIFY_HTML', False)
+
+    if app.config['MINIFY_HTML']:
+        app.jinja_options = dict(
+            app.jinja_options,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            extensions=[*app.jinja_options.get('extensions', []), WhitespaceMinifier],
+        )
+
+    @app.after_request
+    def compress_response(response):
+        if not _should_compress(response):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        encoding = request.accept_encodings.best_match(_encodings())
+        if encoding not in ('br', 'gzip'):
+            return response
+
+        is_static = response.direct_passthrough
+        if is_static:
+            if response.content_length is None or response.content_length > MAX_STATIC_SIZE:
+                return response
+            response.direct_passthrough = False
+
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        etag, weak = response.get_etag()
+        if is_static and etag:
+            body = _compress_static(etag, encoding, data)
+        else:
+            level = app.config['COMPRESS_BR_LEVEL'] if encoding == 'br' else app.config['COMPRESS_LEVEL']
+            body = compress(data, encoding, level)
+        if len(body) >= len(data):
+            return response
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        if etag and not weak:
+            # Same resource, different bytes; a weak ETag keeps 304s working
+            response.set_etag(etag, weak=True)
+        return response
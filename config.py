@@ -17,6 +17,23 @@ class Config:
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER') or 'noreply@oasishotel.com'
+    
+    # Compression settings
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE') or 500)
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL') or 6)
+    COMPRESS_BR_LEVEL = int(os.environ.get('COMPRESS_BR_LEVEL') or 4)
+    MINIFY_HTML = os.environ.get('MINIFY_HTML', 'false').lower() in ['true', 'on', '1']
+    
+    # Asynchronous inquiry ingestion
+    INGEST_ASYNC = os.environ.get('INGEST_ASYNC', 'false').lower() in ['true', 'on', '1']
+    INGEST_QUEUE_SIZE = int(os.environ.get('INGEST_QUEUE_SIZE') or 1000)
+    INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE') or 100)
+    INGEST_FLUSH_INTERVAL = float(os.environ.get('INGEST_FLUSH_INTERVAL') or 0.05)
+    INGEST_ENQUEUE_TIMEOUT = float(os.environ.get('INGEST_ENQUEUE_TIMEOUT') or 2)
+    INGEST_JOURNAL_PATH = os.environ.get('INGEST_JOURNAL_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'ingest.journal'))
+    
+    # Template bytecode cache
+    TEMPLATE_CACHE_DIR = os.environ.get('TEMPLATE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.jinja_cache'))
 
 class DevelopmentConfig(Config):
     DEBUG = True
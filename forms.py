@@ -1,12 +1,13 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, TextAreaField, IntegerField, SelectField, DateField, EmailField, PasswordField, BooleanField
+from wtforms import StringField, TextAreaField, IntegerField, SelectField, SelectMultipleField, DateField, DecimalField, EmailField, PasswordField, BooleanField
 from wtforms.validators import DataRequired, Email, NumberRange, Optional, ValidationError, Length, EqualTo
 from datetime import date, timedelta
+from quotes import HORIZON_DAYS
 
 class BookingForm(FlaskForm):
-    guest_name = StringField('Full Name', validators=[DataRequired()])
-    email = EmailField('Email', validators=[DataRequired(), Email()])
-    phone = StringField('Phone Number', validators=[Optional()])
+    guest_name = StringField('Full Name', validators=[DataRequired(), Length(max=100)])
+    email = EmailField('Email', validators=[DataRequired(), Email(), Length(max=120)])
+    phone = StringField('Phone Number', validators=[Optional(), Length(max=20)])
     room_id = SelectField('Room Type', coerce=int, validators=[DataRequired()])
     check_in = DateField('Check-in Date', validators=[DataRequired()], default=date.today)
     check_out = DateField('Check-out Date', validators=[DataRequired()], default=date.today() + timedelta(days=1))
@@ -14,14 +15,22 @@ class BookingForm(FlaskForm):
     children = IntegerField('Children', validators=[NumberRange(min=0, max=6)], default=0)
     special_requests = TextAreaField('Special Requests', validators=[Optional()])
     
+    def validate_check_in(self, field):
+        if field.data < date.today():
+            raise ValidationError('Check-in date cannot be in the past.')
+    
     def validate_check_out(self, field):
+        if self.check_in.data is None:
+            return
         if field.data <= self.check_in.data:
             raise ValidationError('Check-out date must be after check-in date.')
+        if field.data > date.today() + timedelta(days=HORIZON_DAYS):
+            raise ValidationError(f'Bookings can only be made up to {HORIZON_DAYS} days ahead.')
 
 class ContactForm(FlaskForm):
-    name = StringField('Name', validators=[DataRequired()])
-    email = EmailField('Email', validators=[DataRequired(), Email()])
-    subject = StringField('Subject', validators=[DataRequired()])
+    name = StringField('Name', validators=[DataRequired(), Length(max=100)])
+    email = EmailField('Email', validators=[DataRequired(), Email(), Length(max=120)])
+    subject = StringField('Subject', validators=[DataRequired(), Length(max=200)])
     message = TextAreaField('Message', validators=[DataRequired()])
 
 class AdminLoginForm(FlaskForm):
@@ -47,3 +56,22 @@ class RoomForm(FlaskForm):
     bed_type = StringField('Bed Type', validators=[Optional()])
     amenities = TextAreaField('Amenities (comma-separated)', validators=[Optional()])
     is_available = BooleanField('Available for Booking', default=True)
+
+class RatePlanForm(FlaskForm):
+    name = StringField('Plan Name', validators=[DataRequired(), Length(min=2, max=100)])
+    room_id = SelectField('Room', coerce=int, default=0)
+    start_date = DateField('Start Date', validators=[DataRequired()], default=date.today)
+    end_date = DateField('End Date', validators=[DataRequired()], default=date.today)
+    weekdays = SelectMultipleField('Days of Week', coerce=int, validators=[Optional()], choices=[
+        (0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'),
+        (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday'),
+    ])
+    nightly_rate = IntegerField('Fixed Rate per Night (KES)', validators=[Optional(), NumberRange(min=1)])
+    multiplier = DecimalField('Multiplier', places=2, validators=[DataRequired(), NumberRange(min=0.1, max=10)], default=1)
+    priority = IntegerField('Priority', validators=[NumberRange(min=0, max=100)], default=0)
+    
+    def validate_end_date(self, field):
+        if self.start_date.data is None:
+            return
+        if field.data < self.start_date.data:
+            raise ValidationError('End date must be on or after start date.')
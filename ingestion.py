@@ -0,0 +1,442 @@
+"""
+Asynchronous, coalesced ingestion of booking and contact inquiries.
+
+With INGEST_ASYNC enabled, validated submissions are appended (and fsynced)
+to a local journal and handed to an in-process queue; the route returns as
+soon as the journal write is durable. A background writer drains the queue
+in batches, inserts each batch with multi-row INSERTs in one transaction,
+then records an acknowledgement in the journal and sends the guest emails.
+Unacknowledged journal entries are replayed when the process starts again.
+Each record's id is stored in ingested_records in the same transaction as
+the inquiry, so a record replayed after a crash between the commit and the
+acknowledgement is skipped rather than inserted twice. Replays happen at the
+next start, so the ids are only kept for DEDUP_RETENTION.
+
+If the writer thread is not running, ingestion_enabled() turns false and
+the routes write synchronously instead.
+
+If the database cannot take any record of a batch, the batch stays in the
+journal and is retried with backoff until it can be written. Only records
+that fail while others in the same batch succeed are moved to the
+dead-letter file (the journal path plus ``.failed``); retry them with
+``flask ingest replay-failed``.
+
+The queue is bounded; when INGEST_QUEUE_SIZE submissions are outstanding,
+new ones wait up to INGEST_ENQUEUE_TIMEOUT seconds and are then rejected
+with IngestQueueFull.
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import insert, select
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; the journal is then unlocked
+    fcntl = None
+
+from app import app, db
+from models import BookingInquiry, ContactInquiry, IngestedRecord
+from availability import update_availability
+from notifications import send_booking_confirmation, send_contact_acknowledgment
+
+# Longest wait, in seconds, between attempts at a batch the database rejects
+MAX_BACKOFF = 30
+
+# Seconds before requests try to open the journal again after it was unavailable
+JOURNAL_RETRY_INTERVAL = 15
+
+# How long written record ids are kept to recognise replays, and how often old ones are deleted
+DEDUP_RETENTION = timedelta(days=7)
+PRUNE_INTERVAL = 3600
+
+BOOKING_DATE_FIELDS = ('check_in', 'check_out')
+
+
+ingest_cli = AppGroup('ingest', help='Journaled inquiry ingestion.')
+
+
+class IngestQueueFull(Exception):
+    """Raised when too many submissions are waiting to be written"""
+
+
+_cond = threading.Condition()
+_queue = queue.Queue()
+_outstanding = set()  # ids of journaled records not yet acknowledged
+_journal = None
+_writer = None
+_stopping = threading.Event()
+_started = False
+_retry_at = 0.0  # time.monotonic() after which opening the journal is tried again
+
+
+def ingestion_enabled():
+    return (app.config.get('INGEST_ASYNC', False) and _journal is not None
+            and _writer is not None and _writer.is_alive())
+
+
+def _journal_append(entry):
+    # Caller holds _cond
+    _journal.write(json.dumps(entry) + '\n')
+    _journal.flush()
+    os.fsync(_journal.fileno())
+
+
+def _journal_truncate():
+    # Caller holds _cond; only safe when nothing is pending
+    _journal.seek(0)
+    _journal.truncate()
+    _journal.flush()
+    os.fsync(_journal.fileno())
+
+
+def _open_journal(path):
+    """Open the journal for appending and return (file, unacknowledged records)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    journal = open(path, 'a+', encoding='utf-8')
+    if fcntl is not None:
+        try:
+            fcntl.flock(journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            journal.close()
+            raise
+
+    journal.seek(0)
+    records = {}
+    for line in journal:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # A torn final write from a crash; the submitter never got a response
+            app.logger.warning('Skipping unreadable ingest journal line')
+            continue
+        if 'ack' in entry:
+            for record_id in entry['ack']:
+                records.pop(record_id, None)
+        else:
+            records[entry['id']] = entry
+    journal.seek(0, os.SEEK_END)
+    return journal, list(records.values())
+
+
+def start_ingestion():
+    """Open the journal, replay unacknowledged records and start the writer"""
+    global _journal, _writer, _started, _retry_at
+    with _cond:
+        if _started or _stopping.is_set():
+            return
+        if not app.config.get('INGEST_ASYNC'):
+            _started = True
+            return
+
+        path = app.config['INGEST_JOURNAL_PATH']
+        try:
+            _journal, replay = _open_journal(path)
+        except OSError as e:
+            # Typically the previous worker still holds the lock during a graceful reload
+            _retry_at = time.monotonic() + JOURNAL_RETRY_INTERVAL
+            app.logger.error(f"Ingest journal {path} unavailable, writing inquiries synchronously for now: {e}")
+            return
+        _started = True
+
+        for record in replay:
+            _queue.put(record)
+        _outstanding.update(record['id'] for record in replay)
+        if replay:
+            app.logger.info(f"Replaying {len(replay)} journaled inquiries")
+
+    _writer = threading.Thread(target=_run_writer, name='inquiry-writer', daemon=True)
+    _writer.start()
+    atexit.register(stop_ingestion)
+
+
+def stop_ingestion(timeout=10):
+    """Ask the writer to drain the queue and wait for it"""
+    _stopping.set()
+    if _writer is not None:
+        _writer.join(timeout)
+
+
+def _submit(kind, data, email):
+    record = {'id': uuid.uuid4().hex, 'kind': kind, 'data': data, 'email': email}
+    with _cond:
+        limit = app.config['INGEST_QUEUE_SIZE']
+        if not _cond.wait_for(lambda: len(_outstanding) < limit, app.config['INGEST_ENQUEUE_TIMEOUT']):
+            raise IngestQueueFull()
+        _journal_append(record)
+        _outstanding.add(record['id'])
+    _queue.put(record)
+    return record['id']
+
+
+def _json_ready(data):
+    return {key: value.isoformat() if isinstance(value, (date, datetime)) else value for key, value in data.items()}
+
+
+def submit_booking(data, room_name):
+    """Durably enqueue a booking inquiry (column name -> value)"""
+    data = dict(data, status='pending', created_at=datetime.utcnow())
+    return _submit('booking', _json_ready(data), {'room_name': room_name})
+
+
+def submit_contact(data):
+    """Durably enqueue a contact inquiry (column name -> value)"""
+    data = dict(data, status='new', created_at=datetime.utcnow())
+    return _submit('contact', _json_ready(data), {})
+
+
+def _booking_row(data):
+    row = dict(data)
+    for field in BOOKING_DATE_FIELDS:
+        row[field] = date.fromisoformat(row[field])
+    row['created_at'] = datetime.fromisoformat(row['created_at'])
+    return row
+
+
+def _contact_row(data):
+    return dict(data, created_at=datetime.fromisoformat(data['created_at']))
+
+
+def _next_batch():
+    """Block for the first record, then take whatever else arrives within the flush interval"""
+    try:
+        batch = [_queue.get(timeout=0.5)]
+    except queue.Empty:
+        return []
+
+    deadline = time.monotonic() + app.config['INGEST_FLUSH_INTERVAL']
+    while len(batch) < app.config['INGEST_BATCH_SIZE']:
+        remaining = deadline - time.monotonic()
+        try:
+            if remaining > 0:
+                batch.append(_queue.get(timeout=remaining))
+            else:
+                batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _take_queued(limit):
+    """Take up to `limit` records that are already queued, without waiting"""
+    records = []
+    while len(records) < limit:
+        try:
+            records.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    return records
+
+
+def _write_batch(batch):
+    """Insert one batch in a single transaction.
+
+    Records already written by an earlier attempt are skipped. Returns the
+    records written and their booking rows.
+    """
+    ids = [record['id'] for record in batch]
+    seen = set(db.session.scalars(select(IngestedRecord.id).where(IngestedRecord.id.in_(ids))))
+    written = [record for record in batch if record['id'] not in seen]
+    if not written:
+        return [], []
+
+    bookings = [_booking_row(record['data']) for record in written if record['kind'] == 'booking']
+    contacts = [_contact_row(record['data']) for record in written if record['kind'] == 'contact']
+
+    if bookings:
+        # New inquiries are always pending, so nothing is added to the reporting rollup
+        db.session.execute(insert(BookingInquiry), bookings)
+    if contacts:
+        db.session.execute(insert(ContactInquiry), contacts)
+    now = datetime.utcnow()
+    db.session.execute(insert(IngestedRecord), [{'id': record['id'], 'created_at': now} for record in written])
+    db.session.commit()
+    return written, bookings
+
+
+def _prune_ingested():
+    """Delete record ids older than DEDUP_RETENTION; returns how many were removed"""
+    cutoff = datetime.utcnow() - DEDUP_RETENTION
+    deleted = IngestedRecord.query.filter(IngestedRecord.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def _dead_letter(batch, error):
+    path = app.config['INGEST_JOURNAL_PATH'] + '.failed'
+    lines = [json.dumps(dict(record, error=str(error))) for record in batch]
+    try:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(''.join(line + '\n' for line in lines))
+    except OSError as e:
+        # Keep the inquiries in the log rather than losing them
+        app.logger.error(f"Could not write {path} ({e}); failed inquiries: " + ' '.join(lines))
+        return
+    app.logger.error(f"Moved {len(batch)} inquiries to {path}: {error}")
+
+
+def _acknowledge(batch):
+    with _cond:
+        ids = [record['id'] for record in batch if record['id'] in _outstanding]
+        if not ids:
+            return
+        _outstanding.difference_update(ids)
+        try:
+            _journal_append({'ack': ids})
+            if not _outstanding:
+                _journal_truncate()
+        except OSError as e:
+            # The records are in the database, so replaying them later only skips them
+            app.logger.error(f"Could not acknowledge {len(ids)} inquiries in the ingest journal: {e}")
+        _cond.notify_all()
+
+
+def _notify(batch, bookings):
+    for row in bookings:
+        update_availability(SimpleNamespace(**row))
+    for record in batch:
+        data = record['data']
+        if record['kind'] == 'booking':
+            send_booking_confirmation(
+                data['guest_name'], data['email'], record['email'].get('room_name'),
+                data['check_in'], data['check_out'], data['adults'], data['children'],
+                data['special_requests'],
+            )
+        else:
+            send_contact_acknowledgment(data['name'], data['email'], data['subject'], data['message'])
+
+
+def _try_write(batch):
+    """Write, acknowledge and notify one batch; returns the error if the write failed"""
+    try:
+        written, bookings = _write_batch(batch)
+    except Exception as e:
+        db.session.rollback()
+        return e
+    _acknowledge(batch)
+    try:
+        _notify(written, bookings)
+    except Exception as e:
+        app.logger.error(f"Inquiry notifications failed: {e}")
+    return None
+
+
+def _process(batch):
+    """Write a batch, isolating records that cannot be inserted.
+
+    When the batch fails, each record is retried on its own. If some succeed,
+    the ones that still fail are bad data and are dead-lettered right away.
+    If none succeed, the database is more likely unavailable: the records stay
+    unacknowledged and are retried with backoff, together with anything queued
+    meanwhile, for as long as it takes. When the writer is stopping they are
+    left in the journal for the next start.
+    """
+    attempt = 0
+    while True:
+        error = _try_write(batch)
+        if error is None:
+            return
+        attempt += 1
+        app.logger.error(f"Inquiry batch of {len(batch)} failed (attempt {attempt}): {error}")
+
+        if len(batch) > 1:
+            failed = []
+            for record in batch:
+                record_error = _try_write([record])
+                if record_error is not None:
+                    failed.append((record, record_error))
+            if len(failed) < len(batch):
+                for record, record_error in failed:
+                    _dead_letter([record], record_error)
+                    _acknowledge([record])
+                return
+
+        if _stopping.wait(min(2 ** attempt, MAX_BACKOFF)):
+            return
+        batch = batch + _take_queued(app.config['INGEST_BATCH_SIZE'] - len(batch))
+
+
+def _run_writer():
+    next_prune = time.monotonic()
+    with app.app_context():
+        while not (_stopping.is_set() and _queue.empty()):
+            batch = []
+            try:
+                if time.monotonic() >= next_prune:
+                    next_prune = time.monotonic() + PRUNE_INTERVAL
+                    _prune_ingested()
+                batch = _next_batch()
+                if batch:
+                    _process(batch)
+            except Exception as e:
+                # Keep the writer alive; whatever was not acknowledged goes back on the queue
+                app.logger.exception(f"Inquiry writer error: {e}")
+                with _cond:
+                    retry = [record for record in batch if record['id'] in _outstanding]
+                for record in retry:
+                    _queue.put(record)
+                time.sleep(1)
+            finally:
+                db.session.remove()
+
+
+@app.before_request
+def _ensure_ingestion_started():
+    if not _started and time.monotonic() >= _retry_at:
+        start_ingestion()
+
+
+def replay_failed():
+    """Retry every record in the dead-letter file; returns (written, still failing).
+
+    The file is moved aside first, so records that fail again are appended to
+    a fresh dead-letter file. A file left by an interrupted replay is picked up
+    again, and records it already wrote are skipped.
+    """
+    path = app.config['INGEST_JOURNAL_PATH'] + '.failed'
+    replaying = path + '.replaying'
+    if not os.path.exists(replaying):
+        if not os.path.exists(path):
+            return 0, 0
+        os.replace(path, replaying)
+
+    written = failed = 0
+    with open(replaying, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            record.pop('error', None)
+            error = _try_write([record])
+            if error is None:
+                written += 1
+            else:
+                _dead_letter([record], error)
+                failed += 1
+    os.remove(replaying)
+    db.session.remove()
+    return written, failed
+
+
+@ingest_cli.command('replay-failed')
+def replay_failed_command():
+    """Retry the inquiries in the dead-letter file."""
+    written, failed = replay_failed()
+    click.echo(f'Replayed dead-lettered inquiries: {written} written, {failed} still failing')
+
+
+app.cli.add_command(ingest_cli)
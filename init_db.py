@@ -18,6 +18,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import app
 from models import db, Room, Amenity, BookingInquiry, ContactInquiry, User
+from reporting import rebuild_daily_room_stats
 from werkzeug.security import generate_password_hash
 
 def create_sample_rooms():
@@ -175,6 +176,10 @@ def main():
         create_sample_amenities()
         create_main_admin()
         
+        # Rebuild the occupancy/revenue rollup
+        stat_rows = rebuild_daily_room_stats()
+        print(f"Rebuilt daily room stats ({stat_rows} rows)")
+        
         print("\nDatabase initialization completed successfully!")
         print("You can now run the application with: python main.py")
         
@@ -46,6 +46,31 @@ class Room(db.Model):
     def __repr__(self):
         return f'<Room {self.name}>'
 
+class RatePlan(db.Model):
+    __tablename__ = 'rate_plans'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'))  # NULL applies to every room
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)  # inclusive
+    weekdays = db.Column(db.String(20))  # comma-separated, Monday=0; NULL means every day
+    nightly_rate = db.Column(db.Numeric(10, 2))  # fixed rate; overrides multiplier when set
+    multiplier = db.Column(db.Numeric(5, 2), nullable=False, default=1)
+    priority = db.Column(db.Integer, nullable=False, default=0)  # highest priority wins per night
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    room = db.relationship('Room', backref=db.backref('rate_plans', lazy=True))
+    
+    @property
+    def weekday_list(self):
+        if not self.weekdays:
+            return []
+        return [int(day) for day in self.weekdays.split(',') if day.strip()]
+    
+    def __repr__(self):
+        return f'<RatePlan {self.name}>'
+
 class Amenity(db.Model):
     __tablename__ = 'amenities'
     
@@ -93,4 +118,39 @@ class ContactInquiry(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
-        return f'<ContactInquiry {self.name} - {self.subject}>'
\ No newline at end of file
+        return f'<ContactInquiry {self.name} - {self.subject}>'
+
+class IngestedRecord(db.Model):
+    __tablename__ = 'ingested_records'
+    
+    id = db.Column(db.String(32), primary_key=True)  # ingest journal record id, written with the inquiry
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<IngestedRecord {self.id}>'
+
+class BookingNight(db.Model):
+    __tablename__ = 'booking_nights'
+    
+    booking_id = db.Column(db.Integer, db.ForeignKey('booking_inquiries.id'), primary_key=True)
+    stay_date = db.Column(db.Date, primary_key=True)
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
+    amount = db.Column(db.Numeric(10, 2), nullable=False)  # nightly rate when the booking was counted
+    
+    booking = db.relationship('BookingInquiry', backref=db.backref('priced_nights', lazy=True))
+    
+    def __repr__(self):
+        return f'<BookingNight {self.booking_id} - {self.stay_date}>'
+
+class DailyRoomStat(db.Model):
+    __tablename__ = 'daily_room_stats'
+    
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), primary_key=True)
+    stat_date = db.Column(db.Date, primary_key=True)
+    nights_booked = db.Column(db.Integer, nullable=False, default=0)  # confirmed inquiries covering this night
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    
+    room = db.relationship('Room', backref=db.backref('daily_stats', lazy=True))
+    
+    def __repr__(self):
+        return f'<DailyRoomStat {self.room_id} - {self.stat_date}>'
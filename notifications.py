@@ -0,0 +1,66 @@
+"""
+Guest notification emails for booking and contact inquiries.
+"""
+
+from flask_mail import Message
+
+from app import app, mail
+
+
+def send_booking_confirmation(guest_name, email, room_name, check_in, check_out, adults, children, special_requests):
+    """Email the guest a summary of their booking inquiry, if mail is configured"""
+    if not app.config['MAIL_USERNAME']:
+        return
+    try:
+        msg = Message(
+            'Booking Inquiry Confirmation - Maria Havens',
+            recipients=[str(email)]
+        )
+        if room_name:
+            msg.body = f"""
+Dear {guest_name},
+
+Thank you for your booking inquiry at Maria Havens.
+
+Booking Details:
+- Room: {room_name}
+- Check-in: {check_in}
+- Check-out: {check_out}
+- Guests: {adults} adults, {children} children
+- Special Requests: {special_requests or 'None'}
+
+We will contact you within 24 hours to confirm your booking.
+
+Best regards,
+The Maria Havens Team
+            """
+        mail.send(msg)
+    except Exception as e:
+        app.logger.error(f"Failed to send email: {e}")
+
+
+def send_contact_acknowledgment(name, email, subject, message):
+    """Email the sender an acknowledgment of their contact inquiry, if mail is configured"""
+    if not app.config['MAIL_USERNAME']:
+        return
+    try:
+        msg = Message(
+            'Contact Inquiry Received - Maria Havens',
+            recipients=[str(email)]
+        )
+        msg.body = f"""
+Dear {name},
+
+Thank you for contacting Maria Havens.
+
+Your inquiry has been received and we will respond within 24 hours.
+
+Subject: {subject}
+Message: {message}
+
+Best regards,
+The Maria Havens Team
+        """
+        mail.send(msg)
+    except Exception as e:
+        app.logger.error(f"Failed to send email: {e}")
@@ -0,0 +1,209 @@
+"""
+Stay-quote engine.
+
+Nightly rates for every room are precomputed once into per-day arrays of
+cents (base price with rate plans applied) together with their prefix sums,
+so the total for any stay is a single subtraction per room. Quotes are
+memoized per (check_in, check_out, occupancy) and both caches are dropped
+whenever a room or rate plan is committed.
+
+The cached table covers a fixed window, HISTORY_DAYS back to HORIZON_DAYS
+ahead of today, and is never grown: guests can only be quoted within the
+booking window, and older stays (priced for reporting) get a throwaway
+table of their own.
+"""
+
+import threading
+from array import array
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import Room, RatePlan
+
+# How far ahead of today stays can be quoted and booked
+HORIZON_DAYS = 730
+
+# Days before today kept in the cached rate table, for reporting on recent stays
+HISTORY_DAYS = 365
+
+# Widest span any rate table may cover
+MAX_TABLE_DAYS = HISTORY_DAYS + HORIZON_DAYS
+
+# Longest stay the quote endpoint will price
+MAX_NIGHTS = 60
+
+CENT = Decimal('0.01')
+
+_lock = threading.Lock()
+_rate_table = None
+
+
+def _to_cents(amount):
+    return int((Decimal(amount) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def _from_cents(cents):
+    return (Decimal(cents) / 100).quantize(CENT)
+
+
+class RateTable:
+    """Nightly rates in cents for every room over [start, end)"""
+
+    def __init__(self, start, end, rooms, plans):
+        if (end - start).days > MAX_TABLE_DAYS:
+            raise ValueError(f"Rate table span {start} to {end} exceeds {MAX_TABLE_DAYS} days")
+        self.start = start
+        self.end = end
+        self.rooms = [
+            {'room_id': room.id, 'name': room.name, 'max_occupancy': room.max_occupancy,
+             'is_available': room.is_available}
+            for room in rooms
+        ]
+        days = (end - start).days
+        self.nightly = {}
+        self.prefix = {}
+
+        # Lowest priority first so higher priority plans overwrite
+        plans = sorted(plans, key=lambda plan: (plan.priority, plan.id))
+        for room in rooms:
+            base = _to_cents(room.price_per_night)
+            rates = array('q', [base]) * days
+            for plan in plans:
+                if plan.room_id is not None and plan.room_id != room.id:
+                    continue
+                self._apply_plan(rates, base, plan)
+
+            prefix = array('q', [0]) * (days + 1)
+            running = 0
+            for i, cents in enumerate(rates):
+                running += cents
+                prefix[i + 1] = running
+
+            self.nightly[room.id] = rates
+            self.prefix[room.id] = prefix
+
+    def _apply_plan(self, rates, base, plan):
+        first = max(plan.start_date, self.start)
+        last = min(plan.end_date + timedelta(days=1), self.end)
+        if first >= last:
+            return
+        if plan.nightly_rate is not None:
+            cents = _to_cents(plan.nightly_rate)
+        else:
+            cents = _to_cents(_from_cents(base) * Decimal(plan.multiplier))
+        weekdays = set(plan.weekday_list)
+        offset = (first - self.start).days
+        for i in range((last - first).days):
+            if not weekdays or (first + timedelta(days=i)).weekday() in weekdays:
+                rates[offset + i] = cents
+
+    def covers(self, check_in, check_out):
+        return self.start <= check_in and check_out <= self.end
+
+    def total_cents(self, room_id, check_in, check_out):
+        prefix = self.prefix[room_id]
+        return prefix[(check_out - self.start).days] - prefix[(check_in - self.start).days]
+
+    def nightly_cents(self, room_id, check_in, check_out):
+        i = (check_in - self.start).days
+        return self.nightly[room_id][i:i + (check_out - check_in).days]
+
+
+def in_booking_window(check_in, check_out):
+    """True if the stay starts today or later and ends within HORIZON_DAYS"""
+    today = date.today()
+    return today <= check_in and check_out <= today + timedelta(days=HORIZON_DAYS)
+
+
+def _get_rate_table(check_in, check_out):
+    """Return a rate table covering the stay.
+
+    The cached table is rebuilt for the current window when the day rolls
+    over; stays outside it are priced from an uncached table of their own.
+    """
+    global _rate_table
+    today = date.today()
+    with _lock:
+        table = _rate_table
+        if table is None or table.start != today - timedelta(days=HISTORY_DAYS):
+            table = RateTable(today - timedelta(days=HISTORY_DAYS), today + timedelta(days=HORIZON_DAYS),
+                              Room.query.all(), RatePlan.query.all())
+            _rate_table = table
+        if table.covers(check_in, check_out):
+            return table
+    return RateTable(check_in, check_out, Room.query.all(), RatePlan.query.all())
+
+
+@lru_cache(maxsize=512)
+def _cached_quotes(check_in, check_out, occupancy):
+    table = _get_rate_table(check_in, check_out)
+    nights = (check_out - check_in).days
+    quotes = []
+    for room in table.rooms:
+        if not room['is_available'] or room['max_occupancy'] < occupancy:
+            continue
+        total = table.total_cents(room['room_id'], check_in, check_out)
+        quotes.append({
+            'room_id': room['room_id'],
+            'name': room['name'],
+            'nights': nights,
+            'total': _from_cents(total),
+            'average_nightly': _from_cents(total // nights),
+        })
+    quotes.sort(key=lambda quote: quote['total'])
+    return tuple(quotes)
+
+
+def get_quotes(check_in, check_out, occupancy):
+    """Price every available room that sleeps `occupancy` guests for the stay.
+
+    Returns a tuple of dicts ordered by total; callers must not mutate them.
+    Stays outside the booking window get no quotes.
+    """
+    if check_out <= check_in or not in_booking_window(check_in, check_out):
+        return ()
+    return _cached_quotes(check_in, check_out, occupancy)
+
+
+def nightly_rates(room_id, check_in, check_out):
+    """Per-night rates (Decimal) for one room, check-out day excluded.
+
+    Raises ValueError for stays longer than MAX_TABLE_DAYS.
+    """
+    if check_out <= check_in:
+        return []
+    table = _get_rate_table(check_in, check_out)
+    if room_id not in table.nightly:
+        return []
+    return [_from_cents(cents) for cents in table.nightly_cents(room_id, check_in, check_out)]
+
+
+def invalidate_rates():
+    """Drop the precomputed rate table and all memoized quotes"""
+    global _rate_table
+    with _lock:
+        _rate_table = None
+    _cached_quotes.cache_clear()
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_rate_changes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Room, RatePlan)):
+            session.info['rates_changed'] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('rates_changed', False):
+        invalidate_rates()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop('rates_changed', None)
@@ -0,0 +1,262 @@
+"""
+Occupancy and revenue for the admin reports.
+
+When a booking inquiry becomes confirmed, each night of the stay is priced
+with the quote engine's current rates and stored in booking_nights. The
+rollup in daily_room_stats sums those rows per room per night. It is
+updated incrementally when a booking is created or its status changes. A
+booking that stops counting subtracts exactly the amounts stored for it,
+so later rate changes cannot make the rollup drift or go negative.
+
+The monthly report counts a room at most once per night. When confirmed
+bookings overlap, that room-night is reported once, with the average of
+their nightly amounts, so occupancy and revenue always describe the same
+nights. The overlapping nights are reported separately as overbooked.
+
+``flask stats rebuild`` recomputes the rollup from booking_nights, pricing
+any counted booking that has no stored nights. ``--reprice`` prices every
+counted booking again at current rates.
+"""
+
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, func, insert, select, text
+
+from app import app, db
+from models import Room, BookingInquiry, BookingNight, DailyRoomStat
+from quotes import nightly_rates
+
+# Statuses whose nights count towards occupancy and revenue
+COUNTED_STATUSES = ('confirmed',)
+
+CENT = Decimal('0.01')
+
+stats_cli = AppGroup('stats', help='Occupancy and revenue rollups.')
+
+# Price the nights of counted bookings that have none stored yet
+PRICE_NIGHTS_SQL = text("""
+    INSERT INTO booking_nights (booking_id, stay_date, room_id, amount)
+    SELECT b.id, d::date, b.room_id,
+           COALESCE(p.nightly_rate, ROUND(r.price_per_night * p.multiplier, 2), r.price_per_night)
+    FROM booking_inquiries b
+    JOIN rooms r ON r.id = b.room_id
+    CROSS JOIN LATERAL generate_series(b.check_in, b.check_out - 1, interval '1 day') AS d
+    LEFT JOIN LATERAL (
+        SELECT rp.nightly_rate, rp.multiplier
+        FROM rate_plans rp
+        WHERE (rp.room_id IS NULL OR rp.room_id = b.room_id)
+          AND d::date BETWEEN rp.start_date AND rp.end_date
+          AND (rp.weekdays IS NULL OR rp.weekdays = ''
+               OR ',' || rp.weekdays || ',' LIKE '%,' || (EXTRACT(ISODOW FROM d)::int - 1) || ',%')
+        ORDER BY rp.priority DESC, rp.id DESC
+        LIMIT 1
+    ) p ON true
+    WHERE b.status IN :statuses AND b.check_out > b.check_in
+      AND NOT EXISTS (SELECT 1 FROM booking_nights n WHERE n.booking_id = b.id)
+""").bindparams(bindparam('statuses', expanding=True))
+
+
+def _nights(check_in, check_out):
+    """Yield every night of a stay (check-out day excluded)"""
+    day = check_in
+    while day < check_out:
+        yield day
+        day += timedelta(days=1)
+
+
+def _price_nights(inquiry):
+    """BookingNight rows for the inquiry's stay at current rates"""
+    if not inquiry.check_in or not inquiry.check_out or inquiry.check_out <= inquiry.check_in:
+        return []
+    rates = nightly_rates(inquiry.room_id, inquiry.check_in, inquiry.check_out)
+    return [
+        BookingNight(booking_id=inquiry.id, stay_date=night, room_id=inquiry.room_id, amount=price)
+        for night, price in zip(_nights(inquiry.check_in, inquiry.check_out), rates)
+    ]
+
+
+def _apply(nights, sign):
+    """Add (sign=1) or remove (sign=-1) priced nights from the rollup"""
+    if not nights:
+        return
+
+    room_ids = {night.room_id for night in nights}
+    dates = [night.stay_date for night in nights]
+    existing = {
+        (stat.room_id, stat.stat_date): stat
+        for stat in DailyRoomStat.query.filter(
+            DailyRoomStat.room_id.in_(room_ids),
+            DailyRoomStat.stat_date >= min(dates),
+            DailyRoomStat.stat_date <= max(dates),
+        )
+    }
+
+    for night in nights:
+        stat = existing.get((night.room_id, night.stay_date))
+        if stat is None:
+            if sign < 0:
+                continue
+            stat = DailyRoomStat(room_id=night.room_id, stat_date=night.stay_date,
+                                 nights_booked=0, revenue=Decimal('0'))
+            db.session.add(stat)
+            existing[(night.room_id, night.stay_date)] = stat
+        stat.nights_booked += sign
+        stat.revenue = Decimal(stat.revenue) + sign * Decimal(night.amount)
+        if stat.nights_booked <= 0:
+            db.session.delete(stat)
+
+
+def _count(inquiry):
+    if inquiry.id is None:
+        db.session.flush()
+    nights = _price_nights(inquiry)
+    db.session.add_all(nights)
+    _apply(nights, 1)
+
+
+def _uncount(inquiry):
+    nights = BookingNight.query.filter_by(booking_id=inquiry.id).all()
+    _apply(nights, -1)
+    for night in nights:
+        db.session.delete(night)
+
+
+def record_booking(inquiry):
+    """Add a newly created inquiry to the rollup if its status is counted.
+
+    Call after adding it to the session and before committing, so the
+    rollup lands in the same transaction.
+    """
+    if inquiry.status in COUNTED_STATUSES:
+        _count(inquiry)
+
+
+def record_status_change(inquiry, old_status):
+    """Adjust the rollup after an inquiry moved from old_status to its current status"""
+    was_counted = old_status in COUNTED_STATUSES
+    is_counted = inquiry.status in COUNTED_STATUSES
+    if was_counted and not is_counted:
+        _uncount(inquiry)
+    elif is_counted and not was_counted:
+        _count(inquiry)
+
+
+def rebuild_daily_room_stats(reprice=False):
+    """Recompute the whole rollup from the stored nightly prices.
+
+    Counted bookings without stored nights are priced at current rates; with
+    reprice=True every counted booking is priced again.
+    """
+    counted = select(BookingInquiry.id).where(BookingInquiry.status.in_(COUNTED_STATUSES))
+    stale = BookingNight.query
+    if not reprice:
+        stale = stale.filter(BookingNight.booking_id.not_in(counted))
+    stale.delete(synchronize_session=False)
+    DailyRoomStat.query.delete()
+
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(PRICE_NIGHTS_SQL, {'statuses': list(COUNTED_STATUSES)})
+    else:
+        # Fallback for databases without generate_series (e.g. local SQLite)
+        unpriced = BookingInquiry.query.filter(
+            BookingInquiry.status.in_(COUNTED_STATUSES),
+            ~select(BookingNight.booking_id).where(BookingNight.booking_id == BookingInquiry.id).exists(),
+        )
+        for inquiry in unpriced:
+            db.session.add_all(_price_nights(inquiry))
+        db.session.flush()
+
+    db.session.execute(
+        insert(DailyRoomStat).from_select(
+            ['room_id', 'stat_date', 'nights_booked', 'revenue'],
+            select(BookingNight.room_id, BookingNight.stay_date, func.count(), func.sum(BookingNight.amount))
+            .group_by(BookingNight.room_id, BookingNight.stay_date),
+        )
+    )
+    db.session.commit()
+    return DailyRoomStat.query.count()
+
+
+def month_bounds(year, month):
+    """Return the first day of the month and the first day of the next month"""
+    first = date(year, month, 1)
+    days = calendar.monthrange(year, month)[1]
+    return first, first + timedelta(days=days)
+
+
+def monthly_report(year, month):
+    """Occupancy and revenue for a month, read only from the rollup table.
+
+    Each room-night counts once; see the module docstring for overlaps.
+    """
+    first, end = month_bounds(year, month)
+    days_in_month = (end - first).days
+    rooms = Room.query.order_by(Room.name).all()
+
+    stats = DailyRoomStat.query.filter(
+        DailyRoomStat.stat_date >= first,
+        DailyRoomStat.stat_date < end,
+    ).all()
+
+    by_room = defaultdict(lambda: {'nights': 0, 'overbooked': 0, 'revenue': Decimal('0')})
+    by_day = defaultdict(lambda: {'rooms_booked': 0, 'revenue': Decimal('0')})
+    for stat in stats:
+        if stat.nights_booked <= 0:
+            continue
+        revenue = (Decimal(stat.revenue) / stat.nights_booked).quantize(CENT)
+        by_room[stat.room_id]['nights'] += 1
+        by_room[stat.room_id]['overbooked'] += stat.nights_booked > 1
+        by_room[stat.room_id]['revenue'] += revenue
+        by_day[stat.stat_date]['rooms_booked'] += 1
+        by_day[stat.stat_date]['revenue'] += revenue
+
+    room_rows = []
+    for room in rooms:
+        totals = by_room[room.id]
+        room_rows.append({
+            'room_id': room.id,
+            'name': room.name,
+            'nights_booked': totals['nights'],
+            'overbooked': totals['overbooked'],
+            'occupancy': round(100.0 * totals['nights'] / days_in_month, 1),
+            'revenue': totals['revenue'],
+        })
+
+    room_count = len(rooms)
+    day_rows = []
+    for offset in range(days_in_month):
+        day = first + timedelta(days=offset)
+        totals = by_day[day]
+        day_rows.append({
+            'date': day,
+            'rooms_booked': totals['rooms_booked'],
+            'occupancy': round(100.0 * totals['rooms_booked'] / room_count, 1) if room_count else 0.0,
+            'revenue': totals['revenue'],
+        })
+
+    total_nights = sum(row['nights_booked'] for row in room_rows)
+    capacity = room_count * days_in_month
+    return {
+        'year': year,
+        'month': month,
+        'rooms': room_rows,
+        'days': day_rows,
+        'occupancy': round(100.0 * total_nights / capacity, 1) if capacity else 0.0,
+        'revenue': sum((row['revenue'] for row in room_rows), Decimal('0')),
+    }
+
+
+@stats_cli.command('rebuild')
+@click.option('--reprice', is_flag=True, help='Price every confirmed booking again at current rates.')
+def rebuild_command(reprice):
+    """Rebuild the daily_room_stats rollup from scratch."""
+    count = rebuild_daily_room_stats(reprice=reprice)
+    click.echo(f'Rebuilt daily_room_stats: {count} rows')
+
+
+app.cli.add_command(stats_cli)
@@ -1,11 +1,16 @@
 from flask import render_template, request, redirect, url_for, flash, jsonify
-from flask_mail import Message
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash
-from app import app, db, mail
-from models import Room, Amenity, BookingInquiry, ContactInquiry, User
-from forms import BookingForm, ContactForm, AdminLoginForm, AdminUserForm, RoomForm
-from datetime import datetime, date
+from app import app, db
+from models import Room, Amenity, BookingInquiry, ContactInquiry, User, RatePlan
+from forms import BookingForm, ContactForm, AdminLoginForm, AdminUserForm, RoomForm, RatePlanForm
+from quotes import get_quotes, in_booking_window, MAX_NIGHTS, HORIZON_DAYS
+from availability import update_availability, calendar_payload
+from asset_manifest import service_worker_script
+from notifications import send_booking_confirmation, send_contact_acknowledgment
+from ingestion import ingestion_enabled, submit_booking, submit_contact, IngestQueueFull
+from reporting import record_booking, record_status_change, monthly_report
+from datetime import datetime, date, timedelta
 
 @app.route('/')
 def index():
@@ -34,65 +39,67 @@ def amenities():
     
     return render_template('amenities.html', amenities_by_category=amenities_by_category)
 
+def _room_choice_label(room, quote):
+    """Booking form label for a room, with the stay total when it has been quoted"""
+    if quote:
+        nights = quote['nights']
+        return f"{room.name} - KES {quote['total']:,.0f} for {nights} night{'s' if nights != 1 else ''}"
+    return f"{room.name} - KES {room.price_per_night:,.0f}/night"
+
 @app.route('/booking', methods=['GET', 'POST'])
 def booking():
     """Booking inquiry page"""
     form = BookingForm()
     rooms = Room.query.filter_by(is_available=True).all()
     
+    # Price the stay for every room in one pass when the dates are usable
+    quotes = {}
+    check_in, check_out = form.check_in.data, form.check_out.data
+    if (check_in and check_out and check_in < check_out and (check_out - check_in).days <= MAX_NIGHTS
+            and in_booking_window(check_in, check_out)):
+        occupancy = (form.adults.data or 1) + (form.children.data or 0)
+        quotes = {quote['room_id']: quote for quote in get_quotes(check_in, check_out, occupancy)}
+    
     # Populate room choices
-    form.room_id.choices = [(room.id, f"{room.name} - ${room.price_per_night}/night") for room in rooms]
+    form.room_id.choices = [(room.id, _room_choice_label(room, quotes.get(room.id))) for room in rooms]
     
     if form.validate_on_submit():
+        room_name = next((room.name for room in rooms if room.id == form.room_id.data), None)
+        data = {
+            'guest_name': form.guest_name.data,
+            'email': form.email.data,
+            'phone': form.phone.data,
+            'room_id': form.room_id.data,
+            'check_in': form.check_in.data,
+            'check_out': form.check_out.data,
+            'adults': form.adults.data,
+            'children': form.children.data,
+            'special_requests': form.special_requests.data,
+        }
         try:
-            # Create booking inquiry
-            inquiry = BookingInquiry()
-            inquiry.guest_name = form.guest_name.data
-            inquiry.email = form.email.data
-            inquiry.phone = form.phone.data
-            inquiry.room_id = form.room_id.data
-            inquiry.check_in = form.check_in.data
-            inquiry.check_out = form.check_out.data
-            inquiry.adults = form.adults.data
-            inquiry.children = form.children.data
-            inquiry.special_requests = form.special_requests.data
-            
-            db.session.add(inquiry)
-            db.session.commit()
-            
-            # Send confirmation email if mail is configured
-            try:
-                if app.config['MAIL_USERNAME']:
-                    room = Room.query.get(form.room_id.data)
-                    msg = Message(
-                        'Booking Inquiry Confirmation - Maria Havens',
-                        recipients=[str(form.email.data)]
-                    )
-                    if room:
-                        msg.body = f"""
-Dear {form.guest_name.data},
-
-Thank you for your booking inquiry at Maria Havens.
-
-Booking Details:
-- Room: {room.name}
-- Check-in: {form.check_in.data}
-- Check-out: {form.check_out.data}
-- Guests: {form.adults.data} adults, {form.children.data} children
-- Special Requests: {form.special_requests.data or 'None'}
-
-We will contact you within 24 hours to confirm your booking.
-
-Best regards,
-The Maria Havens Team
-                        """
-                    mail.send(msg)
-            except Exception as e:
-                app.logger.error(f"Failed to send email: {e}")
+            if ingestion_enabled():
+                # Written and emailed by the background writer
+                submit_booking(data, room_name)
+            else:
+                # Create booking inquiry
+                inquiry = BookingInquiry(**data)
+                
+                db.session.add(inquiry)
+                record_booking(inquiry)
+                db.session.commit()
+                update_availability(inquiry)
+                
+                # Send confirmation email if mail is configured
+                send_booking_confirmation(
+                    form.guest_name.data, form.email.data, room_name, form.check_in.data,
+                    form.check_out.data, form.adults.data, form.children.data, form.special_requests.data,
+                )
             
             flash('Your booking inquiry has been submitted successfully! We will contact you soon.', 'success')
             return redirect(url_for('booking'))
-            
+        
+        except IngestQueueFull:
+            flash('We are receiving a lot of inquiries right now. Please try again in a moment.', 'warning')
         except Exception as e:
             db.session.rollback()
             app.logger.error(f"Booking error: {e}")
@@ -100,50 +107,77 @@ The Maria Havens Team
     
     return render_template('booking.html', form=form, rooms=rooms)
 
+@app.route('/api/quote')
+def api_quote():
+    """Stay totals for every room that fits the party, as JSON"""
+    try:
+        check_in = date.fromisoformat(request.args.get('check_in', ''))
+        check_out = date.fromisoformat(request.args.get('check_out', ''))
+        adults = int(request.args.get('adults', 1))
+        children = int(request.args.get('children', 0))
+    except ValueError:
+        return jsonify({'error': 'check_in and check_out must be YYYY-MM-DD dates'}), 400
+    
+    nights = (check_out - check_in).days
+    if nights < 1 or nights > MAX_NIGHTS:
+        return jsonify({'error': f'Stay must be between 1 and {MAX_NIGHTS} nights'}), 400
+    if not in_booking_window(check_in, check_out):
+        return jsonify({'error': f'Stays must start today or later and end within {HORIZON_DAYS} days'}), 400
+    if adults < 1 or children < 0:
+        return jsonify({'error': 'Invalid number of guests'}), 400
+    
+    quotes = get_quotes(check_in, check_out, adults + children)
+    return jsonify({
+        'check_in': check_in.isoformat(),
+        'check_out': check_out.isoformat(),
+        'nights': nights,
+        'occupancy': adults + children,
+        'quotes': [dict(quote, total=float(quote['total']), average_nightly=float(quote['average_nightly']))
+                   for quote in quotes],
+    })
+
+@app.route('/api/availability')
+def api_availability():
+    """Twelve months of per-room availability bitmaps, as JSON"""
+    today = date.today()
+    year, month = _parse_month(request.args.get('start', '')) or (today.year, today.month)
+    
+    response = jsonify(calendar_payload(year, month))
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    return response
+
 @app.route('/contact', methods=['GET', 'POST'])
 def contact():
     """Contact page"""
     form = ContactForm()
     
     if form.validate_on_submit():
+        data = {
+            'name': form.name.data,
+            'email': form.email.data,
+            'subject': form.subject.data,
+            'message': form.message.data,
+        }
         try:
-            # Create contact inquiry
-            inquiry = ContactInquiry()
-            inquiry.name = form.name.data
-            inquiry.email = form.email.data
-            inquiry.subject = form.subject.data
-            inquiry.message = form.message.data
-            
-            db.session.add(inquiry)
-            db.session.commit()
-            
-            # Send acknowledgment email if mail is configured
-            try:
-                if app.config['MAIL_USERNAME']:
-                    msg = Message(
-                        'Contact Inquiry Received - Maria Havens',
-                        recipients=[str(form.email.data)]
-                    )
-                    msg.body = f"""
-Dear {form.name.data},
-
-Thank you for contacting Maria Havens.
-
-Your inquiry has been received and we will respond within 24 hours.
-
-Subject: {form.subject.data}
-Message: {form.message.data}
-
-Best regards,
-The Maria Havens Team
-                    """
-                    mail.send(msg)
-            except Exception as e:
-                app.logger.error(f"Failed to send email: {e}")
+            if ingestion_enabled():
+                # Written and acknowledged by the background writer
+                submit_contact(data)
+            else:
+                # Create contact inquiry
+                inquiry = ContactInquiry(**data)
+                
+                db.session.add(inquiry)
+                db.session.commit()
+                
+                # Send acknowledgment email if mail is configured
+                send_contact_acknowledgment(form.name.data, form.email.data, form.subject.data, form.message.data)
             
             flash('Your message has been sent successfully! We will get back to you soon.', 'success')
             return redirect(url_for('contact'))
-            
+        
+        except IngestQueueFull:
+            flash('We are receiving a lot of messages right now. Please try again in a moment.', 'warning')
         except Exception as e:
             db.session.rollback()
             app.logger.error(f"Contact error: {e}")
@@ -156,6 +190,19 @@ def gallery():
     """Hotel gallery page"""
     return render_template('gallery.html')
 
+@app.route('/offline')
+def offline():
+    """Fallback page shown by the service worker when there is no connection"""
+    return render_template('offline.html')
+
+@app.route('/sw.js')
+def service_worker():
+    """Service worker, served from the root so it controls the whole site"""
+    response = app.response_class(service_worker_script(app, url_for('offline')),
+                                  mimetype='application/javascript')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.errorhandler(404)
 def page_not_found(e):
     return render_template('404.html'), 404
@@ -246,12 +293,72 @@ def update_booking_status():
         return redirect(url_for('admin_bookings'))
     
     booking = BookingInquiry.query.get_or_404(booking_id)
+    old_status = booking.status
     booking.status = new_status
+    record_status_change(booking, old_status)
     db.session.commit()
+    update_availability(booking, old_status)
     
     flash(f'Booking status updated to {new_status}', 'success')
     return redirect(url_for('admin_bookings'))
 
+# Reports can be browsed this many years either side of the current year
+REPORT_YEARS = 50
+
+def _parse_month(value):
+    """Parse a YYYY-MM string into (year, month); None if it is not a valid month"""
+    try:
+        year, month = (int(part) for part in value.split('-'))
+        date(year, month, 1)
+    except ValueError:
+        return None
+    return year, month
+
+def _report_month():
+    """Parse the ?month=YYYY-MM query argument, defaulting to the current month"""
+    today = date.today()
+    parsed = _parse_month(request.args.get('month', ''))
+    if parsed is None:
+        return today.year, today.month
+    year, month = parsed
+    # Keep the prev/next links (and the report query) within a sane range
+    year = min(max(year, today.year - REPORT_YEARS), today.year + REPORT_YEARS)
+    return year, month
+
+@app.route('/admin/reports')
+@login_required
+def admin_reports():
+    """Occupancy and revenue reports"""
+    if not current_user.is_admin:
+        flash('Access denied. Admin privileges required.', 'danger')
+        return redirect(url_for('index'))
+    
+    year, month = _report_month()
+    report = monthly_report(year, month)
+    prev_month = date(year, month, 1) - timedelta(days=1)
+    next_month = date(year, month, 28) + timedelta(days=4)
+    
+    return render_template('admin/reports.html', report=report,
+                         prev_month=prev_month.strftime('%Y-%m'),
+                         next_month=next_month.strftime('%Y-%m'))
+
+@app.route('/admin/reports/data')
+@login_required
+def admin_reports_data():
+    """Occupancy and revenue report as JSON"""
+    if not current_user.is_admin:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    year, month = _report_month()
+    report = monthly_report(year, month)
+    return jsonify({
+        'month': f"{year:04d}-{month:02d}",
+        'occupancy': report['occupancy'],
+        'revenue': float(report['revenue']),
+        'rooms': [dict(row, revenue=float(row['revenue'])) for row in report['rooms']],
+        'days': [dict(row, date=row['date'].isoformat(), revenue=float(row['revenue'])) for row in report['days']],
+    })
+
 @app.route('/admin/rooms')
 @login_required
 def admin_rooms():
@@ -321,6 +428,62 @@ def admin_edit_room(room_id):
     
     return render_template('admin/room_form.html', form=form, title='Edit Room', room=room)
 
+@app.route('/admin/rates')
+@login_required
+def admin_rate_plans():
+    """Admin rate plan management"""
+    if not current_user.is_admin:
+        flash('Access denied. Admin privileges required.', 'danger')
+        return redirect(url_for('index'))
+    
+    rate_plans = RatePlan.query.order_by(RatePlan.start_date.desc(), RatePlan.priority.desc()).all()
+    return render_template('admin/rate_plans.html', rate_plans=rate_plans)
+
+@app.route('/admin/rate/add', methods=['GET', 'POST'])
+@login_required
+def admin_add_rate_plan():
+    """Add new rate plan"""
+    if not current_user.is_admin:
+        flash('Access denied. Admin privileges required.', 'danger')
+        return redirect(url_for('index'))
+    
+    form = RatePlanForm()
+    form.room_id.choices = [(0, 'All rooms')] + [(room.id, room.name) for room in Room.query.order_by(Room.name).all()]
+    
+    if form.validate_on_submit():
+        plan = RatePlan()
+        plan.name = form.name.data
+        plan.room_id = form.room_id.data or None
+        plan.start_date = form.start_date.data
+        plan.end_date = form.end_date.data
+        plan.weekdays = ','.join(str(day) for day in sorted(form.weekdays.data)) or None
+        plan.nightly_rate = form.nightly_rate.data
+        plan.multiplier = form.multiplier.data
+        plan.priority = form.priority.data or 0
+        
+        db.session.add(plan)
+        db.session.commit()
+        
+        flash('Rate plan added successfully!', 'success')
+        return redirect(url_for('admin_rate_plans'))
+    
+    return render_template('admin/rate_plan_form.html', form=form, title='Add Rate Plan')
+
+@app.route('/admin/rate/<int:plan_id>/delete', methods=['POST'])
+@login_required
+def admin_delete_rate_plan(plan_id):
+    """Delete rate plan"""
+    if not current_user.is_admin:
+        flash('Access denied. Admin privileges required.', 'danger')
+        return redirect(url_for('index'))
+    
+    plan = RatePlan.query.get_or_404(plan_id)
+    db.session.delete(plan)
+    db.session.commit()
+    
+    flash('Rate plan deleted successfully.', 'success')
+    return redirect(url_for('admin_rate_plans'))
+
 @app.route('/admin/users')
 @login_required
 def admin_users():
@@ -6,6 +6,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeAnimations();
     initializeForms();
     initializeGallery();
+    initializeAvailabilityCalendars();
 });
 
 // Navbar functionality
@@ -190,6 +191,94 @@ function initializeGallery() {
     });
 }
 
+// Availability calendar
+function initializeAvailabilityCalendars() {
+    const calendars = document.querySelectorAll('[data-availability-url]');
+    if (!calendars.length) return;
+    
+    // All calendars on the page share one 12-month response
+    fetch(calendars[0].dataset.availabilityUrl)
+        .then(response => response.ok ? response.json() : null)
+        .then(data => {
+            if (!data) return;
+            calendars.forEach(container => renderAvailabilityCalendar(container, data));
+        })
+        .catch(() => {});
+}
+
+function renderAvailabilityCalendar(container, data) {
+    const weekdays = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'];
+    const externalSelect = container.dataset.roomSelect ? document.querySelector(container.dataset.roomSelect) : null;
+    const today = new Date().toISOString().split('T')[0];
+    let monthIndex = 0;
+    let roomSelect = externalSelect;
+    
+    if (!data.rooms.length) {
+        container.innerHTML = '<p class="text-muted mb-0">No rooms available.</p>';
+        return;
+    }
+    
+    container.innerHTML = `
+        <div class="d-flex flex-wrap justify-content-between align-items-center mb-3 gap-2">
+            <button type="button" class="btn btn-sm btn-outline-secondary" data-calendar-prev aria-label="Previous month">
+                <i class="fas fa-chevron-left"></i>
+            </button>
+            <h6 class="mb-0" data-calendar-title></h6>
+            <button type="button" class="btn btn-sm btn-outline-secondary" data-calendar-next aria-label="Next month">
+                <i class="fas fa-chevron-right"></i>
+            </button>
+        </div>
+        <div class="availability-grid" data-calendar-grid></div>
+        <div class="d-flex gap-3 mt-2 small text-muted">
+            <span><span class="availability-swatch free"></span>Available</span>
+            <span><span class="availability-swatch booked"></span>Booked</span>
+        </div>
+    `;
+    
+    if (!roomSelect) {
+        roomSelect = document.createElement('select');
+        roomSelect.className = 'form-select mb-3';
+        roomSelect.setAttribute('aria-label', 'Room');
+        data.rooms.forEach(room => {
+            const option = document.createElement('option');
+            option.value = room.room_id;
+            option.textContent = room.name;
+            roomSelect.appendChild(option);
+        });
+        container.prepend(roomSelect);
+    }
+    
+    const title = container.querySelector('[data-calendar-title]');
+    const grid = container.querySelector('[data-calendar-grid]');
+    
+    function render() {
+        const month = data.months[monthIndex];
+        const room = data.rooms.find(r => String(r.room_id) === String(roomSelect.value)) || data.rooms[0];
+        const booked = room.booked[monthIndex];
+        const [year, monthNumber] = month.month.split('-').map(Number);
+        
+        title.textContent = new Date(year, monthNumber - 1, 1).toLocaleDateString(undefined, { month: 'long', year: 'numeric' });
+        
+        let html = weekdays.map(day => `<div class="availability-weekday">${day}</div>`).join('');
+        html += '<div></div>'.repeat(month.first_weekday);
+        for (let day = 1; day <= month.days; day++) {
+            const iso = `${month.month}-${String(day).padStart(2, '0')}`;
+            const isBooked = (booked >>> (day - 1)) & 1;
+            const state = iso < today ? 'past' : (isBooked ? 'booked' : 'free');
+            html += `<div class="availability-day ${state}" title="${iso}">${day}</div>`;
+        }
+        grid.innerHTML = html;
+        
+        container.querySelector('[data-calendar-prev]').disabled = monthIndex === 0;
+        container.querySelector('[data-calendar-next]').disabled = monthIndex === data.months.length - 1;
+    }
+    
+    container.querySelector('[data-calendar-prev]').addEventListener('click', () => { monthIndex--; render(); });
+    container.querySelector('[data-calendar-next]').addEventListener('click', () => { monthIndex++; render(); });
+    roomSelect.addEventListener('change', render);
+    render();
+}
+
 // Smooth scrolling for anchor links
 function initializeSmoothScroll() {
     const anchorLinks = document.querySelectorAll('a[href^="#"]');
@@ -247,6 +336,15 @@ function initializeBackToTop() {
     });
 }
 
+// Service worker for offline browsing
+function initializeServiceWorker() {
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register('/sw.js').catch(error => {
+            console.warn('Service worker registration failed:', error);
+        });
+    }
+}
+
 // Auto-dismiss alerts
 function initializeAlerts() {
     const alerts = document.querySelectorAll('.alert');
@@ -307,6 +405,7 @@ window.addEventListener('load', function() {
     initializeSmoothScroll();
     initializeBackToTop();
     initializeAlerts();
+    initializeServiceWorker();
 });
 
 // Export for use in other scripts
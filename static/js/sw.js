@@ -0,0 +1,105 @@
+// Service worker for Maria Havens
+// self.ASSET_MANIFEST ({version, precache, offline}) is prepended by the /sw.js route
+
+const MANIFEST = self.ASSET_MANIFEST;
+const STATIC_CACHE = `static-${MANIFEST.version}`;
+const PAGES_CACHE = `pages-${MANIFEST.version}`;
+const CDN_CACHE = `cdn-${MANIFEST.version}`;
+const CURRENT_CACHES = [STATIC_CACHE, PAGES_CACHE, CDN_CACHE];
+
+// Served from cache while refreshing in the background
+const STALE_WHILE_REVALIDATE_PAGES = ['/rooms', '/amenities', '/gallery'];
+
+// Never intercepted: forms with CSRF tokens, admin and JSON endpoints
+const NETWORK_ONLY_PREFIXES = ['/admin', '/booking', '/contact', '/api/', '/sw.js'];
+
+const CDN_HOSTS = ['cdn.jsdelivr.net', 'cdnjs.cloudflare.com'];
+
+self.addEventListener('install', event => {
+    const urls = [...MANIFEST.precache, MANIFEST.offline];
+    event.waitUntil(
+        caches.open(STATIC_CACHE)
+            .then(cache => cache.addAll(urls.map(url => new Request(url, { cache: 'reload' }))))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    // Purge caches from previous deploys
+    event.waitUntil(
+        caches.keys()
+            .then(names => Promise.all(
+                names.filter(name => !CURRENT_CACHES.includes(name)).map(name => caches.delete(name))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    
+    const url = new URL(request.url);
+    if (url.origin === self.location.origin) {
+        if (NETWORK_ONLY_PREFIXES.some(prefix => url.pathname.startsWith(prefix))) return;
+        
+        if (url.pathname.startsWith('/static/')) {
+            event.respondWith(cacheFirst(request, STATIC_CACHE));
+        } else if (STALE_WHILE_REVALIDATE_PAGES.includes(url.pathname)) {
+            event.respondWith(staleWhileRevalidate(event, PAGES_CACHE));
+        } else if (request.mode === 'navigate') {
+            event.respondWith(networkWithOfflineFallback(request));
+        }
+    } else if (CDN_HOSTS.includes(url.hostname)) {
+        event.respondWith(cacheFirst(request, CDN_CACHE));
+    }
+});
+
+function isCacheable(response) {
+    // CDN tags are requested with crossorigin, so error statuses are visible and never stored
+    return response && response.ok;
+}
+
+function offlineFallback() {
+    return caches.match(MANIFEST.offline)
+        .then(response => response || Response.error());
+}
+
+function cacheFirst(request, cacheName) {
+    return caches.open(cacheName).then(cache =>
+        cache.match(request).then(cached => {
+            if (cached) return cached;
+            return fetch(request).then(response => {
+                if (isCacheable(response)) {
+                    cache.put(request, response.clone());
+                }
+                return response;
+            });
+        })
+    );
+}
+
+function staleWhileRevalidate(event, cacheName) {
+    const request = event.request;
+    return caches.open(cacheName).then(cache =>
+        cache.match(request).then(cached => {
+            const network = fetch(request).then(response => {
+                if (response.ok) {
+                    cache.put(request, response.clone());
+                }
+                return response;
+            });
+            
+            if (cached) {
+                // Keep the worker alive until the refresh has been stored
+                event.waitUntil(network.catch(() => {}));
+                return cached;
+            }
+            return network.catch(offlineFallback);
+        })
+    );
+}
+
+function networkWithOfflineFallback(request) {
+    return fetch(request).catch(offlineFallback);
+}
@@ -0,0 +1,41 @@
+"""
+Shared fixtures: the app runs against a throwaway SQLite database.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+# Configure the app before it is imported; app.py reads these at import time
+_tmp = tempfile.mkdtemp(prefix='maria-havens-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_tmp, 'test.db')
+os.environ['TEMPLATE_CACHE_DIR'] = ''
+os.environ['INGEST_ASYNC'] = 'false'
+os.environ['INGEST_JOURNAL_PATH'] = os.path.join(_tmp, 'ingest.journal')
+os.environ['MAIL_USERNAME'] = ''
+
+from app import app as flask_app  # noqa: E402
+from models import db, Room  # noqa: E402
+from quotes import invalidate_rates  # noqa: E402
+from availability import invalidate_availability  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    flask_app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        invalidate_rates()
+        invalidate_availability()
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def room(app):
+    room = Room(name='Garden Suite', description='Test room', price_per_night=5000, max_occupancy=2)
+    db.session.add(room)
+    db.session.commit()
+    return room
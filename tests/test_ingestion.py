@@ -0,0 +1,125 @@
+import json
+import os
+import queue
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import ingestion
+from models import db, BookingInquiry, ContactInquiry, IngestedRecord
+
+
+def _contact(name='Guest'):
+    return {'name': name, 'email': 'guest@example.com', 'subject': 'Hello', 'message': 'Hi there'}
+
+
+def _reset():
+    ingestion._outstanding.clear()
+    while True:
+        try:
+            ingestion._queue.get_nowait()
+        except queue.Empty:
+            break
+    ingestion._stopping.clear()
+
+
+def _reopen(path):
+    """Simulate a restart: close the journal and replay it as start_ingestion does"""
+    if ingestion._journal is not None:
+        ingestion._journal.close()
+    _reset()
+    ingestion._journal, replay = ingestion._open_journal(path)
+    ingestion._outstanding.update(record['id'] for record in replay)
+    return replay
+
+
+@pytest.fixture
+def journal(app, tmp_path):
+    path = str(tmp_path / 'ingest.journal')
+    app.config.update(INGEST_ASYNC=True, INGEST_JOURNAL_PATH=path)
+    _reopen(path)
+    yield path
+    ingestion._journal.close()
+    ingestion._journal = None
+    _reset()
+    app.config.update(INGEST_ASYNC=False)
+
+
+def test_replay_after_crash_between_commit_and_ack_is_skipped(journal, room):
+    ingestion.submit_contact(_contact())
+    ingestion.submit_booking({
+        'guest_name': 'Guest', 'email': 'guest@example.com', 'phone': None, 'room_id': room.id,
+        'check_in': date.today() + timedelta(days=3), 'check_out': date.today() + timedelta(days=5),
+        'adults': 2, 'children': 0, 'special_requests': None,
+    }, room.name)
+
+    # Committed, then the process dies before acknowledging
+    batch = ingestion._take_queued(10)
+    ingestion._write_batch(batch)
+    assert ContactInquiry.query.count() == 1
+    assert BookingInquiry.query.count() == 1
+
+    replay = _reopen(journal)
+    assert {record['id'] for record in replay} == {record['id'] for record in batch}
+
+    ingestion._process(replay)
+    assert ContactInquiry.query.count() == 1
+    assert BookingInquiry.query.count() == 1
+    assert _reopen(journal) == []
+
+
+def test_database_down_keeps_records_in_journal(journal):
+    db.session.remove()
+    ContactInquiry.__table__.drop(db.engine)
+    for i in range(3):
+        ingestion.submit_contact(_contact(f'Guest {i}'))
+
+    # Stopping makes _process give up after the first round instead of backing off
+    ingestion._stopping.set()
+    ingestion._process(ingestion._take_queued(10))
+    assert not os.path.exists(journal + '.failed')
+    assert len(ingestion._outstanding) == 3
+
+    replay = _reopen(journal)
+    assert len(replay) == 3
+
+    ContactInquiry.__table__.create(db.engine)
+    ingestion._process(replay)
+    assert ContactInquiry.query.count() == 3
+    assert not os.path.exists(journal + '.failed')
+    assert _reopen(journal) == []
+
+
+def test_only_the_bad_record_is_dead_lettered_and_can_be_replayed(journal):
+    ingestion.submit_contact(_contact())
+    bad_id = ingestion.submit_contact(_contact(name=None))
+
+    ingestion._process(ingestion._take_queued(10))
+    assert ContactInquiry.query.count() == 1
+    with open(journal + '.failed', encoding='utf-8') as f:
+        failed = [json.loads(line) for line in f]
+    assert [record['id'] for record in failed] == [bad_id]
+    assert _reopen(journal) == []
+
+    # Still broken: filed again
+    assert ingestion.replay_failed() == (0, 1)
+
+    with open(journal + '.failed', encoding='utf-8') as f:
+        record = json.loads(f.readline())
+    record['data']['name'] = 'Fixed'
+    with open(journal + '.failed', 'w', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+    assert ingestion.replay_failed() == (1, 0)
+    assert ContactInquiry.query.count() == 2
+    assert ingestion.replay_failed() == (0, 0)
+
+
+def test_prune_removes_only_expired_ids(app):
+    db.session.add_all([
+        IngestedRecord(id='old', created_at=datetime.utcnow() - ingestion.DEDUP_RETENTION - timedelta(days=1)),
+        IngestedRecord(id='new', created_at=datetime.utcnow()),
+    ])
+    db.session.commit()
+
+    assert ingestion._prune_ingested() == 1
+    assert [record.id for record in IngestedRecord.query.all()] == ['new']
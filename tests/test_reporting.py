@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from models import db, BookingInquiry, BookingNight, DailyRoomStat, RatePlan
+from reporting import record_booking, record_status_change, rebuild_daily_room_stats, monthly_report
+
+
+def _book(room, check_in, nights, status='pending'):
+    inquiry = BookingInquiry(
+        guest_name='Guest', email='guest@example.com', room_id=room.id,
+        check_in=check_in, check_out=check_in + timedelta(days=nights),
+        adults=2, children=0, status=status,
+    )
+    db.session.add(inquiry)
+    record_booking(inquiry)
+    db.session.commit()
+    return inquiry
+
+
+def _set_status(inquiry, status):
+    old_status = inquiry.status
+    inquiry.status = status
+    record_status_change(inquiry, old_status)
+    db.session.commit()
+
+
+def _rollup():
+    return sorted(
+        (stat.room_id, stat.stat_date, stat.nights_booked, Decimal(stat.revenue))
+        for stat in DailyRoomStat.query.all()
+    )
+
+
+def test_confirm_then_cancel_returns_to_zero(room):
+    inquiry = _book(room, date.today() + timedelta(days=10), 3)
+    assert _rollup() == []
+
+    _set_status(inquiry, 'confirmed')
+    rows = _rollup()
+    assert [row[2] for row in rows] == [1, 1, 1]
+    assert sum(row[3] for row in rows) == Decimal('15000')
+
+    _set_status(inquiry, 'cancelled')
+    assert _rollup() == []
+    assert BookingNight.query.count() == 0
+
+
+def test_cancel_after_rate_change_subtracts_original_prices(room):
+    check_in = date.today() + timedelta(days=5)
+    first = _book(room, check_in, 2, status='confirmed')
+    second = _book(room, check_in, 2, status='confirmed')
+
+    db.session.add(RatePlan(name='Peak', start_date=check_in, end_date=check_in + timedelta(days=1),
+                            nightly_rate=9000))
+    db.session.commit()
+
+    _set_status(first, 'cancelled')
+    assert [(row[2], row[3]) for row in _rollup()] == [(1, Decimal('5000')), (1, Decimal('5000'))]
+
+    _set_status(second, 'cancelled')
+    assert _rollup() == []
+
+
+def test_rebuild_matches_incremental_rollup(room):
+    start = date.today() + timedelta(days=3)
+    kept = _book(room, start, 4)
+    _set_status(kept, 'confirmed')
+    dropped = _book(room, start + timedelta(days=2), 3, status='confirmed')
+    _set_status(dropped, 'cancelled')
+    _book(room, start + timedelta(days=20), 2, status='confirmed')
+    _book(room, start + timedelta(days=30), 2)
+
+    incremental = _rollup()
+    assert incremental
+
+    rebuild_daily_room_stats()
+    assert _rollup() == incremental
+
+    rebuild_daily_room_stats(reprice=True)
+    assert _rollup() == incremental
+
+
+def test_monthly_report_counts_overlapping_nights_once(room):
+    first_of_month = date.today().replace(day=1) + timedelta(days=40)
+    first_of_month = first_of_month.replace(day=1)
+    _book(room, first_of_month, 2, status='confirmed')
+    _book(room, first_of_month, 1, status='confirmed')
+
+    report = monthly_report(first_of_month.year, first_of_month.month)
+    row = report['rooms'][0]
+    assert row['nights_booked'] == 2
+    assert row['overbooked'] == 1
+    assert row['revenue'] == Decimal('10000')
+    assert report['revenue'] == Decimal('10000')